@@ -2,11 +2,36 @@
 Build All Graphs: Process all formatted data and generate graph files
 Batch processing script that creates graph files for all clubs and seasons.
 Output files are ready for visualization in Java/GraphStream.
+Files are independent, so they are built in parallel worker processes.
 """
 
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from graph_builder import FootballGraphBuilder
 
+
+def _build_graph_file(txt_file, output_file):
+    """Build and save graph for one file (runs in a worker process), return its log"""
+    log = io.StringIO()
+    
+    try:
+        # Capture builder output so logs of parallel workers don't interleave
+        with redirect_stdout(log):
+            builder = FootballGraphBuilder(str(txt_file))
+            builder.load_and_build()
+            builder.calculate_statistics()
+            builder.save_for_java(str(output_file))
+    except Exception as e:
+        # Keep the partial log with the error - it shows how far the file got
+        e.log = log.getvalue()
+        raise
+    
+    return log.getvalue()
+
+
 def build_all_graphs():
     """Process all formatted data files and generate graphs"""
     
@@ -22,24 +47,24 @@ def build_all_graphs():
     success = 0
     errors = 0
     
-    for i, txt_file in enumerate(txt_files, 1):
-        output_name = txt_file.stem + '_graph.txt'
-        output_file = graphs_dir / output_name
-        
-        print(f"\n{'='*60}")
-        print(f"[{i}/{len(txt_files)}] Processing: {txt_file.name}")
-        print(f"{'='*60}")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(_build_graph_file, txt_file, graphs_dir / (txt_file.stem + '_graph.txt'))
+            for txt_file in txt_files
+        ]
         
-        try:
-            builder = FootballGraphBuilder(str(txt_file))
-            builder.load_data()
-            builder.build_graph()
-            builder.calculate_statistics()
-            builder.save_for_java(str(output_file))
-            success += 1
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            errors += 1
+        for i, (txt_file, future) in enumerate(zip(txt_files, futures), 1):
+            print(f"\n{'='*60}")
+            print(f"[{i}/{len(txt_files)}] Processing: {txt_file.name}")
+            print(f"{'='*60}")
+            
+            try:
+                print(future.result(), end='')
+                success += 1
+            except Exception as e:
+                print(getattr(e, 'log', ''), end='')
+                print(f"❌ Error: {e}")
+                errors += 1
     
     print(f"\n{'='*60}")
     print(f"📊 FINAL SUMMARY")
@@ -3,147 +3,157 @@ DynamicScore Calculator for Football Team Evolution Project
 Calculates V-DynamicScore and E-DynamicScore between consecutive seasons
 """
 
-import networkx as nx
-import json
+import heapq
+import io
+import orjson
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from operator import itemgetter
 from pathlib import Path
 from collections import defaultdict
+from sys import intern
+from graph_builder import findall_mmap
 
+# EDGE player1 | player2 | weight | matches1 | matches2
+EDGE_RE = re.compile(
+    rb'^[ \t]*EDGE[ \t]+([^|\r\n]*?)[ \t]*\|[ \t]*([^|\r\n]*?)[ \t]*\|'
+    rb'[ \t]*(\d+)[ \t]*\|[ \t]*(\d+)[ \t]*\|[ \t]*(\d+)',
+    re.MULTILINE
+)
 
-def load_graph(filepath):
+
+class SeasonSnapshot:
+    """
+    Players, partnerships and match counts of one season (all the score pass needs)
+    V: set of players, E: canonical edge tuple -> weight, matches: player -> matches
+    """
+    __slots__ = ('V', 'E', 'matches')
+    
+    def __init__(self, V, E, matches):
+        self.V = V
+        self.E = E
+        self.matches = matches
+
+
+def load_snapshot(filepath):
     """
-    Load graph from GraphStream format file
+    Load season snapshot from GraphStream format file (no NetworkX graph is built)
     Format: EDGE player1 | player2 | weight | matches1 | matches2
     """
-    G = nx.Graph()
+    matches = {}
+    E = {}
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or not line.startswith('EDGE'):
-                continue
-            
-            parts = line[5:].split('|')  # Skip 'EDGE '
-            if len(parts) < 5:
-                continue
-            
-            player1 = parts[0].strip()
-            player2 = parts[1].strip()
-            weight = int(parts[2].strip())
-            matches1 = int(parts[3].strip())
-            matches2 = int(parts[4].strip())
-            
-            # Add nodes with matches attribute
-            if player1 not in G:
-                G.add_node(player1, matches=matches1)
-            if player2 not in G:
-                G.add_node(player2, matches=matches2)
-            
-            # Add edge with weight
-            G.add_edge(player1, player2, weight=weight)
+    for name1, name2, weight, matches1, matches2 in findall_mmap(filepath, EDGE_RE):
+        # Interned - set/dict probes across seasons compare by identity first
+        player1 = intern(name1.decode('utf-8'))
+        player2 = intern(name2.decode('utf-8'))
+        
+        # Matches from the first line a player appears in
+        matches.setdefault(player1, int(matches1))
+        matches.setdefault(player2, int(matches2))
+        
+        E[_edge_key(player1, player2)] = int(weight)
     
-    return G
+    return SeasonSnapshot(set(matches), E, matches)
+
+
+def _edge_key(u, v):
+    """Canonical undirected edge (sorted tuple - cheaper to build and hash than frozenset)"""
+    return (u, v) if u < v else (v, u)
 
 
-def calculate_v_dynamic_score(G_t, G_t1):
+def calculate_v_dynamic_score(snap_t, snap_t1):
     """
     Calculate V-DynamicScore (vertex/player changes)
     Formula: |V_{t+1} △ V_t| / |V_{t+1} ∪ V_t|
     where △ is symmetric difference (A∪B - A∩B)
     """
-    V_t = set(G_t.nodes())
-    V_t1 = set(G_t1.nodes())
+    union = len(snap_t.V | snap_t1.V)
     
-    symmetric_diff = V_t.symmetric_difference(V_t1)
-    union = V_t.union(V_t1)
-    
-    if len(union) == 0:
+    if union == 0:
         return 0.0
     
-    return len(symmetric_diff) / len(union)
+    return len(snap_t.V ^ snap_t1.V) / union
 
 
-def calculate_e_dynamic_score(G_t, G_t1):
+def calculate_e_dynamic_score(snap_t, snap_t1):
     """
     Calculate E-DynamicScore (edge/partnership changes)
     Formula: |E_{t+1} △ E_t| / |E_{t+1} ∪ E_t|
     """
-    # Convert edges to frozensets for proper set operations
-    E_t = set(frozenset(edge) for edge in G_t.edges())
-    E_t1 = set(frozenset(edge) for edge in G_t1.edges())
-    
-    symmetric_diff = E_t.symmetric_difference(E_t1)
-    union = E_t.union(E_t1)
+    # Key views of canonical edge tuples support set operators directly
+    E_t, E_t1 = snap_t.E.keys(), snap_t1.E.keys()
+    union = len(E_t | E_t1)
     
-    if len(union) == 0:
+    if union == 0:
         return 0.0
     
-    return len(symmetric_diff) / len(union)
+    return len(E_t ^ E_t1) / union
 
 
-def get_player_changes(G_t, G_t1):
+def _top(items, field, limit=None):
+    """
+    Sort items by given field, descending
+    With limit, only the top N are selected (heap - no full sort); ties keep input order either way
+    """
+    if limit is None:
+        return sorted(items, key=itemgetter(field), reverse=True)
+    return heapq.nlargest(limit, items, key=itemgetter(field))
+
+
+def get_player_changes(snap_t, snap_t1, limit=None):
     """
     Get lists of players who left and joined
+    limit: keep only the top N of each list
     """
-    V_t = set(G_t.nodes())
-    V_t1 = set(G_t1.nodes())
-    
-    players_left = list(V_t - V_t1)
-    players_joined = list(V_t1 - V_t)
+    players_left = list(snap_t.V - snap_t1.V)
+    players_joined = list(snap_t1.V - snap_t.V)
     
-    # Sort by number of matches (if available)
-    players_left_with_matches = [(p, G_t.nodes[p].get('matches', 0)) for p in players_left]
-    players_joined_with_matches = [(p, G_t1.nodes[p].get('matches', 0)) for p in players_joined]
+    # Sorted by number of matches
+    players_left_with_matches = [(p, snap_t.matches[p]) for p in players_left]
+    players_joined_with_matches = [(p, snap_t1.matches[p]) for p in players_joined]
     
-    players_left_with_matches.sort(key=lambda x: x[1], reverse=True)
-    players_joined_with_matches.sort(key=lambda x: x[1], reverse=True)
-    
-    return players_left_with_matches, players_joined_with_matches
+    return _top(players_left_with_matches, 1, limit), _top(players_joined_with_matches, 1, limit)
 
 
-def get_edge_changes(G_t, G_t1):
+def get_edge_changes(snap_t, snap_t1, limit=None):
     """
     Get lists of edges (partnerships) that were lost and gained
+    limit: keep only the top N of each list
     """
-    E_t = set(frozenset(edge) for edge in G_t.edges())
-    E_t1 = set(frozenset(edge) for edge in G_t1.edges())
-    
-    edges_lost_set = E_t - E_t1
-    edges_gained_set = E_t1 - E_t
-    
-    # Convert back to list with weights
-    edges_lost = []
-    for edge in edges_lost_set:
-        p1, p2 = list(edge)
-        weight = G_t[p1][p2]['weight']
-        edges_lost.append([p1, p2, weight])
+    W_t, W_t1 = snap_t.E, snap_t1.E
     
-    edges_gained = []
-    for edge in edges_gained_set:
-        p1, p2 = list(edge)
-        weight = G_t1[p1][p2]['weight']
-        edges_gained.append([p1, p2, weight])
+    # Set difference on key views, weights from the same maps
+    edges_lost = [[p1, p2, W_t[(p1, p2)]] for p1, p2 in W_t.keys() - W_t1.keys()]
+    edges_gained = [[p1, p2, W_t1[(p1, p2)]] for p1, p2 in W_t1.keys() - W_t.keys()]
     
     # Sort by weight (strongest partnerships first)
-    edges_lost.sort(key=lambda x: x[2], reverse=True)
-    edges_gained.sort(key=lambda x: x[2], reverse=True)
-    
-    return edges_lost, edges_gained
+    return _top(edges_lost, 2, limit), _top(edges_gained, 2, limit)
 
 
 def process_season_pair(graph_t_path, graph_t1_path, club, season_t, season_t1):
     """
     Process a pair of consecutive seasons and calculate all metrics
     """
-    G_t = load_graph(graph_t_path)
-    G_t1 = load_graph(graph_t1_path)
+    snap_t = load_snapshot(graph_t_path)
+    snap_t1 = load_snapshot(graph_t1_path)
     
+    return process_season_pair_snapshots(snap_t, snap_t1, club, season_t, season_t1)
+
+
+def process_season_pair_snapshots(snap_t, snap_t1, club, season_t, season_t1):
+    """
+    Same as process_season_pair, for already loaded snapshots (see load_snapshot)
+    """
     # Calculate DynamicScores
-    v_score = calculate_v_dynamic_score(G_t, G_t1)
-    e_score = calculate_e_dynamic_score(G_t, G_t1)
+    v_score = calculate_v_dynamic_score(snap_t, snap_t1)
+    e_score = calculate_e_dynamic_score(snap_t, snap_t1)
     
     # Get changes
-    players_left, players_joined = get_player_changes(G_t, G_t1)
-    edges_lost, edges_gained = get_edge_changes(G_t, G_t1)
+    players_left, players_joined = get_player_changes(snap_t, snap_t1, limit=10)
+    edges_lost, edges_gained = get_edge_changes(snap_t, snap_t1, limit=10)
     
     result = {
         "club": club,
@@ -152,10 +162,10 @@ def process_season_pair(graph_t_path, graph_t1_path, club, season_t, season_t1):
         "v_score": round(v_score, 3),
         "e_score": round(e_score, 3),
         "stats": {
-            "total_players_t": G_t.number_of_nodes(),
-            "total_players_t1": G_t1.number_of_nodes(),
-            "total_edges_t": G_t.number_of_edges(),
-            "total_edges_t1": G_t1.number_of_edges()
+            "total_players_t": len(snap_t.V),
+            "total_players_t1": len(snap_t1.V),
+            "total_edges_t": len(snap_t.E),
+            "total_edges_t1": len(snap_t1.E)
         },
         "players_left": [{"name": p, "matches": m} for p, m in players_left[:10]],  # Top 10
         "players_joined": [{"name": p, "matches": m} for p, m in players_joined[:10]],  # Top 10
@@ -166,6 +176,51 @@ def process_season_pair(graph_t_path, graph_t1_path, club, season_t, season_t1):
     return result
 
 
+def _dump_json(output_file, data):
+    """
+    Save data as indented JSON (UTF-8)
+    """
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+def _process_club(graphs_path, club, seasons, existing):
+    """
+    Process all consecutive seasons of one club (runs in a worker process)
+    existing: names of graph files present in graphs_path
+    Returns club results and captured log
+    """
+    log = io.StringIO()
+    club_results = []
+    
+    try:
+        # Capture output so logs of parallel workers don't interleave
+        with redirect_stdout(log):
+            # Load every season once (middle seasons are used by two transitions)
+            snapshots = []
+            for season in seasons:
+                graph_name = f"{club}_{season}_graph.txt"
+                snapshots.append(load_snapshot(graphs_path / graph_name) if graph_name in existing else None)
+            
+            for i in range(len(seasons) - 1):
+                season_t = seasons[i]
+                season_t1 = seasons[i + 1]
+                
+                if snapshots[i] is None or snapshots[i + 1] is None:
+                    print(f"  Skipping {season_t} -> {season_t1} (files not found)")
+                    continue
+                
+                print(f"  {season_t} -> {season_t1}")
+                result = process_season_pair_snapshots(snapshots[i], snapshots[i + 1], club, season_t, season_t1)
+                club_results.append(result)
+    except Exception as e:
+        # Keep the partial log with the error - it shows how far the club got
+        e.log = log.getvalue()
+        raise
+    
+    return club_results, log.getvalue()
+
+
 def process_all_clubs(graphs_dir, output_dir):
     """
     Process all clubs and all their consecutive seasons
@@ -181,14 +236,15 @@ def process_all_clubs(graphs_dir, output_dir):
         print(f"Expected path: {graphs_path.absolute()}")
         return []
     
-    # List all graph files to show user what exists
-    all_files = list(graphs_path.glob("*_graph.txt"))
-    if len(all_files) == 0:
+    # List all graph files once (one directory scan instead of a stat per season file)
+    with os.scandir(graphs_path) as entries:
+        existing = {entry.name for entry in entries if entry.name.endswith("_graph.txt") and entry.is_file()}
+    if len(existing) == 0:
         print(f"\nError: No graph files found in {graphs_path}")
         print(f"Expected files like: Barcelona_2015_2016_graph.txt")
         return []
     
-    print(f"\nFound {len(all_files)} graph files in {graphs_path}")
+    print(f"\nFound {len(existing)} graph files in {graphs_path}")
     
     # Club names (matching actual file format)
     clubs = ["athletic_bilbao", "atletico_madryt", "fc_barcelona", "real_madryt", "villarreal_cf"]
@@ -198,37 +254,37 @@ def process_all_clubs(graphs_dir, output_dir):
     
     all_results = []
     
-    for club in clubs:
-        print(f"\nProcessing {club}...")
-        club_results = []
+    # JSON files are written in background threads while the next club is collected
+    with ThreadPoolExecutor(max_workers=4) as io_pool:
+        writes = []
         
-        for i in range(len(seasons) - 1):
-            season_t = seasons[i]
-            season_t1 = seasons[i + 1]
-            
-            graph_t_file = graphs_path / f"{club}_{season_t}_graph.txt"
-            graph_t1_file = graphs_path / f"{club}_{season_t1}_graph.txt"
+        # Clubs are independent - each one is processed in its own worker process
+        with ProcessPoolExecutor(max_workers=min(len(clubs), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_process_club, graphs_path, club, seasons, existing) for club in clubs]
             
-            if not graph_t_file.exists() or not graph_t1_file.exists():
-                print(f"  Skipping {season_t} -> {season_t1} (files not found)")
-                continue
-            
-            print(f"  {season_t} -> {season_t1}")
-            result = process_season_pair(graph_t_file, graph_t1_file, club, season_t, season_t1)
-            club_results.append(result)
-            all_results.append(result)
+            for club, future in zip(clubs, futures):
+                print(f"\nProcessing {club}...")
+                try:
+                    club_results, log = future.result()
+                except Exception as e:
+                    print(getattr(e, 'log', ''), end='')
+                    raise
+                print(log, end='')
+                all_results.extend(club_results)
+                
+                # Save club-specific results
+                club_output_file = output_path / f"{club}_dynamic_scores.json"
+                writes.append(io_pool.submit(_dump_json, club_output_file, club_results))
+                
+                print(f"  Saved {len(club_results)} transitions to {club_output_file}")
         
-        # Save club-specific results
-        club_output_file = output_path / f"{club}_dynamic_scores.json"
-        with open(club_output_file, 'w', encoding='utf-8') as f:
-            json.dump(club_results, f, indent=2, ensure_ascii=False)
+        # Save all results combined
+        all_output_file = output_path / "all_dynamic_scores.json"
+        writes.append(io_pool.submit(_dump_json, all_output_file, all_results))
         
-        print(f"  Saved {len(club_results)} transitions to {club_output_file}")
-    
-    # Save all results combined
-    all_output_file = output_path / "all_dynamic_scores.json"
-    with open(all_output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, indent=2, ensure_ascii=False)
+        # Re-raise write errors
+        for write in writes:
+            write.result()
     
     print(f"\n✓ Total: {len(all_results)} transitions processed")
     print(f"✓ Saved to {output_path}/")
@@ -244,11 +300,11 @@ def generate_summary_report(results, output_file):
         print("\n⚠ No transitions found - cannot generate summary report")
         return
     
-    # Sort by V-Score
-    v_sorted = sorted(results, key=lambda x: x['v_score'], reverse=True)
+    # Top 10 by V-Score
+    v_top = heapq.nlargest(10, results, key=itemgetter('v_score'))
     
-    # Sort by E-Score
-    e_sorted = sorted(results, key=lambda x: x['e_score'], reverse=True)
+    # Top 10 by E-Score
+    e_top = heapq.nlargest(10, results, key=itemgetter('e_score'))
     
     report = {
         "summary": {
@@ -262,7 +318,7 @@ def generate_summary_report(results, output_file):
                 "transition": f"{r['season_from']} -> {r['season_to']}",
                 "v_score": r['v_score']
             }
-            for r in v_sorted[:10]
+            for r in v_top
         ],
         "top_e_changes": [
             {
@@ -270,7 +326,7 @@ def generate_summary_report(results, output_file):
                 "transition": f"{r['season_from']} -> {r['season_to']}",
                 "e_score": r['e_score']
             }
-            for r in e_sorted[:10]
+            for r in e_top
         ],
         "most_stable_v": [
             {
@@ -278,7 +334,7 @@ def generate_summary_report(results, output_file):
                 "transition": f"{r['season_from']} -> {r['season_to']}",
                 "v_score": r['v_score']
             }
-            for r in sorted(results, key=lambda x: x['v_score'])[:10]
+            for r in heapq.nsmallest(10, results, key=itemgetter('v_score'))
         ],
         "most_stable_e": [
             {
@@ -286,12 +342,11 @@ def generate_summary_report(results, output_file):
                 "transition": f"{r['season_from']} -> {r['season_to']}",
                 "e_score": r['e_score']
             }
-            for r in sorted(results, key=lambda x: x['e_score'])[:10]
+            for r in heapq.nsmallest(10, results, key=itemgetter('e_score'))
         ]
     }
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    _dump_json(output_file, report)
     
     print(f"\n✓ Summary report saved to {output_file}")
     
@@ -1,4 +1,5 @@
 import json
+from operator import itemgetter
 from pathlib import Path
 
 class SimpleFormatConverter:
@@ -32,65 +33,88 @@ class SimpleFormatConverter:
             print(f"❌ Invalid match structure in: {self.json_file}")
             return
         
-        # Detect team name (most frequent)
-        team_counts = {}
-        for match in matches:
-            if not isinstance(match, dict):
-                continue
-            home = match.get('home_team', '')
-            away = match.get('away_team', '')
-            if home:
-                team_counts[home] = team_counts.get(home, 0) + 1
-            if away:
-                team_counts[away] = team_counts.get(away, 0) + 1
-        
-        if not team_counts:
+        team_name, simple_matches = to_simple_matches(matches)
+        
+        if not team_name:
             print(f"❌ No teams found in: {self.json_file}")
             return
         
-        team_name = max(team_counts.items(), key=lambda x: x[1])[0]
-        
         print(f"📊 Team: {team_name}")
         print(f"⚽ Matches: {len(matches)}")
         
         # Save in simple format
-        with open(self.output_file, 'w', encoding='utf-8') as out:
-            out.write(f"# Team: {team_name}\n")
-            out.write(f"# Format: MATCH: id | date | opponent\n")
-            out.write(f"#         PLAYERS: player1, player2, ...\n\n")
-            
-            for match in matches:
-                if not isinstance(match, dict):
-                    continue
-                
-                # Determine if our team is home or away
-                if match.get('home_team') == team_name:
-                    players = match.get('home_players', [])
-                    opponent = match.get('away_team', 'Unknown')
-                else:
-                    players = match.get('away_players', [])
-                    opponent = match.get('home_team', 'Unknown')
-                
-                # Only starting lineup (11 players)
-                starting_lineup = [
-                    p['name'] for p in players 
-                    if isinstance(p, dict) and p.get('starting_lineup', False)
-                ]
-                
-                # Skip match if no players
-                if not starting_lineup:
-                    continue
-                
-                # Save match
-                match_id = match.get('match_id', 'unknown')
-                match_date = match.get('date', 'unknown')
-                
-                out.write(f"MATCH: {match_id} | {match_date} | {opponent}\n")
-                out.write(f"PLAYERS: {', '.join(starting_lineup)}\n\n")
+        save_simple_format(team_name, simple_matches, self.output_file)
         
         print(f"✅ Saved: {self.output_file}")
 
 
+def to_simple_matches(matches):
+    """
+    Reduce scraped matches to starting lineups of the tracked team
+    Returns (team_name, [{'id', 'date', 'opponent', 'players'}, ...])
+    """
+    # Detect team name (most frequent)
+    team_counts = {}
+    for match in matches:
+        if not isinstance(match, dict):
+            continue
+        home = match.get('home_team', '')
+        away = match.get('away_team', '')
+        if home:
+            team_counts[home] = team_counts.get(home, 0) + 1
+        if away:
+            team_counts[away] = team_counts.get(away, 0) + 1
+    
+    if not team_counts:
+        return None, []
+    
+    team_name = max(team_counts.items(), key=itemgetter(1))[0]
+    
+    simple_matches = []
+    for match in matches:
+        if not isinstance(match, dict):
+            continue
+        
+        # Determine if our team is home or away
+        if match.get('home_team') == team_name:
+            players = match.get('home_players', [])
+            opponent = match.get('away_team', 'Unknown')
+        else:
+            players = match.get('away_players', [])
+            opponent = match.get('home_team', 'Unknown')
+        
+        # Only starting lineup (11 players)
+        starting_lineup = [
+            p['name'] for p in players 
+            if isinstance(p, dict) and p.get('starting_lineup', False)
+        ]
+        
+        # Skip match if no players
+        if not starting_lineup:
+            continue
+        
+        simple_matches.append({
+            'id': match.get('match_id', 'unknown'),
+            'date': match.get('date', 'unknown'),
+            'opponent': opponent,
+            'players': starting_lineup
+        })
+    
+    return team_name, simple_matches
+
+
+def save_simple_format(team_name, simple_matches, output_file):
+    """Write matches from to_simple_matches in the MATCH/PLAYERS text format"""
+    with open(output_file, 'w', encoding='utf-8') as out:
+        out.write(f"# Team: {team_name}\n")
+        out.write(f"# Format: MATCH: id | date | opponent\n")
+        out.write(f"#         PLAYERS: player1, player2, ...\n\n")
+        
+        for match in simple_matches:
+            out.write(f"MATCH: {match['id']} | {match['date']} | {match['opponent']}\n")
+            out.write(f"PLAYERS: {', '.join(match['players'])}\n\n")
+
+
 def convert_all_clubs():
     """Convert all JSON files to simple text format"""
     
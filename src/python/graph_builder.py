@@ -4,81 +4,99 @@ Creates a graph where nodes are players and edges represent matches played toget
 Edge weights = number of matches two players played together.
 """
 
+import heapq
+import mmap
+import os
+import re
 import networkx as nx
+import numpy as np
+from operator import itemgetter
 from pathlib import Path
-from collections import defaultdict
+from sys import intern
+
+# MATCH: id | date | opponent, followed by PLAYERS: player1, player2, ... (format_converter output)
+# Lines may be indented; blank, comment and other lines between MATCH and PLAYERS are skipped
+# Groups: id, date, opponent (empty if missing, further | fields ignored), players
+MATCH_RE = re.compile(
+    rb'^[ \t]*MATCH:[ \t]*([^|\r\n]*?)[ \t]*'
+    rb'(?:\|[ \t]*([^|\r\n]*?)[ \t]*)?'
+    rb'(?:\|[ \t]*([^|\r\n]*?)[ \t]*(?:\|[^\r\n]*)?)?\r?\n'
+    rb'(?:(?![ \t]*(?:MATCH|PLAYERS):)[^\r\n]*\r?\n)*'
+    rb'[ \t]*PLAYERS:([^\r\n]*)',
+    re.MULTILINE
+)
+
+
+def findall_mmap(path, regex):
+    """All matches of a bytes regex in a file (one regex sweep over the mapped file)"""
+    with open(path, 'rb') as f:
+        # Empty files can't be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return regex.findall(mm)
+
 
 class FootballGraphBuilder:
     def __init__(self, txt_file):
         self.txt_file = txt_file
         self.graph = nx.Graph()
         self.matches = []
-        self.player_stats = defaultdict(lambda: {'matches': 0, 'partners': set()})
         
+    @classmethod
+    def from_matches(cls, matches):
+        """
+        Create builder from in-memory matches (skips load_data)
+        Each match: {'id': ..., 'date': ..., 'opponent': ..., 'players': [...]}
+        """
+        builder = cls(None)
+        builder.matches = list(matches)
+        return builder
+    
     def load_data(self):
         """Load data from text file"""
         print(f"📂 Loading: {Path(self.txt_file).name}")
         
-        with open(self.txt_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        for match_id, date, opponent, players_str in self._read_match_rows():
+            self.matches.append({
+                'id': match_id.decode('utf-8'),
+                'date': date.decode('utf-8'),
+                'opponent': opponent.decode('utf-8'),
+                'players': [intern(p.strip()) for p in players_str.decode('utf-8').split(',')]
+            })
         
-        current_match = None
+        print(f"✅ Loaded {len(self.matches)} matches")
+        return self
+    
+    def load_and_build(self):
+        """
+        Load text file and build graph in one pass (same as load_data + build_graph)
+        Lineups go straight into the graph, self.matches is not filled
+        """
+        print(f"📂 Loading: {Path(self.txt_file).name}")
+        print(f"🔨 Building graph...")
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip comments and empty lines
-            if line.startswith('#') or not line:
-                continue
-            
-            # New match
-            if line.startswith('MATCH:'):
-                parts = line.split('|')
-                match_id = parts[0].replace('MATCH:', '').strip()
-                date = parts[1].strip() if len(parts) > 1 else ''
-                opponent = parts[2].strip() if len(parts) > 2 else ''
-                current_match = {'id': match_id, 'date': date, 'opponent': opponent}
-            
-            # Players
-            elif line.startswith('PLAYERS:'):
-                if current_match:
-                    players_str = line.replace('PLAYERS:', '').strip()
-                    players = [p.strip() for p in players_str.split(',')]
-                    current_match['players'] = players
-                    self.matches.append(current_match)
+        match_count = self._add_lineups(
+            [intern(p.strip()) for p in players_str.decode('utf-8').split(',')]
+            for *_, players_str in self._read_match_rows()
+        )
+        
+        print(f"✅ Loaded {match_count} matches")
+        print(f"✅ Graph ready:")
+        print(f"   - Players: {self.graph.number_of_nodes()}")
+        print(f"   - Connections: {self.graph.number_of_edges()}")
         
-        print(f"✅ Loaded {len(self.matches)} matches")
         return self
     
+    def _read_match_rows(self):
+        """(id, date, opponent, players) byte strings of every match in the text file"""
+        return findall_mmap(self.txt_file, MATCH_RE)
+    
     def build_graph(self):
         """Build co-occurrence graph"""
         print(f"🔨 Building graph...")
         
-        for match in self.matches:
-            players = match['players']
-            
-            # Add nodes
-            for player in players:
-                if not self.graph.has_node(player):
-                    self.graph.add_node(player, matches=0)
-                
-                # Increment match counter
-                self.graph.nodes[player]['matches'] += 1
-                self.player_stats[player]['matches'] += 1
-            
-            # Add edges (every player with every other player in the lineup)
-            for i, player1 in enumerate(players):
-                for player2 in players[i+1:]:
-                    if self.graph.has_edge(player1, player2):
-                        # Increase weight
-                        self.graph[player1][player2]['weight'] += 1
-                    else:
-                        # Add new edge
-                        self.graph.add_edge(player1, player2, weight=1)
-                    
-                    # Statistics
-                    self.player_stats[player1]['partners'].add(player2)
-                    self.player_stats[player2]['partners'].add(player1)
+        self._add_lineups(match['players'] for match in self.matches)
         
         print(f"✅ Graph ready:")
         print(f"   - Players: {self.graph.number_of_nodes()}")
@@ -86,6 +104,52 @@ class FootballGraphBuilder:
         
         return self
     
+    def _add_lineups(self, lineups):
+        """Count co-occurrences of lineups (lists of player names), return number of lineups"""
+        # Small-int player IDs in first-seen order
+        player_ids = {}
+        lineups = [
+            np.array([player_ids.setdefault(p, len(player_ids)) for p in players], dtype=np.int64)
+            for players in lineups
+        ]
+        names = list(player_ids)
+        n_players = len(names)
+        
+        # All pairs of every lineup at once (starting XIs are usually 11, but an incomplete one can be shorter)
+        pair_index = {}
+        lows, highs = [], []
+        for ids in lineups:
+            size = len(ids)
+            if size not in pair_index:
+                pair_index[size] = np.triu_indices(size, 1)
+            iu, ju = pair_index[size]
+            a, b = ids[iu], ids[ju]
+            lows.append(np.minimum(a, b))
+            highs.append(np.maximum(a, b))
+        
+        all_ids = np.concatenate(lineups) if lineups else np.empty(0, dtype=np.int64)
+        low = np.concatenate(lows) if lows else np.empty(0, dtype=np.int64)
+        high = np.concatenate(highs) if highs else np.empty(0, dtype=np.int64)
+        
+        # Match counters and edge weights in one C call each
+        node_matches = np.bincount(all_ids, minlength=n_players)
+        keys, first_seen, weights = np.unique(low * n_players + high, return_index=True, return_counts=True)
+        
+        # Edges in first-seen order, so saved files keep the same order
+        order = np.argsort(first_seen, kind='stable')
+        keys, weights = keys[order], weights[order]
+        edge_u, edge_v = np.divmod(keys, n_players) if n_players else (keys, keys)
+        
+        # Bulk insert into NetworkX graph
+        self.graph.add_nodes_from(
+            (name, {'matches': count}) for name, count in zip(names, node_matches.tolist())
+        )
+        self.graph.add_weighted_edges_from(
+            (names[u], names[v], weight) for u, v, weight in zip(edge_u.tolist(), edge_v.tolist(), weights.tolist())
+        )
+        
+        return len(lineups)
+    
     def calculate_statistics(self):
         """Calculate graph statistics"""
         print(f"\n{'='*60}")
@@ -97,24 +161,25 @@ class FootballGraphBuilder:
         print(f"Connections: {self.graph.number_of_edges()}")
         print(f"Density: {nx.density(self.graph):.3f}")
         
-        # Top players by number of matches
-        top_players = sorted(
-            [(node, data['matches']) for node, data in self.graph.nodes(data=True)],
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
+        # Top players by number of matches (partial sort - only top K is kept)
+        top_players = heapq.nlargest(
+            10,
+            ((node, data['matches']) for node, data in self.graph.nodes(data=True)),
+            key=itemgetter(1)
+        )
         
         print(f"\n🏆 Top 10 players (by matches):")
         for i, (player, matches) in enumerate(top_players, 1):
-            partners = len(self.player_stats[player]['partners'])
+            # Distinct partners = neighbours in the graph
+            partners = len(self.graph[player])
             print(f"   {i:2}. {player:30} - {matches} matches, {partners} partners")
         
         # Strongest connections
-        top_edges = sorted(
-            [(u, v, d['weight']) for u, v, d in self.graph.edges(data=True)],
-            key=lambda x: x[2],
-            reverse=True
-        )[:5]
+        top_edges = heapq.nlargest(
+            5,
+            ((u, v, d['weight']) for u, v, d in self.graph.edges(data=True)),
+            key=itemgetter(2)
+        )
         
         print(f"\n🤝 Top 5 pairs (most matches together):")
         for i, (p1, p2, weight) in enumerate(top_edges, 1):
@@ -122,11 +187,11 @@ class FootballGraphBuilder:
         
         # Centrality
         degree_centrality = nx.degree_centrality(self.graph)
-        top_central = sorted(
+        top_central = heapq.nlargest(
+            5,
             degree_centrality.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+            key=itemgetter(1)
+        )
         
         print(f"\n⭐ Top 5 centrality (most important):")
         for i, (player, centrality) in enumerate(top_central, 1):
@@ -173,8 +238,7 @@ def main():
     
     # Build graph
     builder = FootballGraphBuilder(str(txt_file))
-    builder.load_data()
-    builder.build_graph()
+    builder.load_and_build()
     builder.calculate_statistics()
     builder.save_for_java(str(output_file))
     